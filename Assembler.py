@@ -1,453 +1,143 @@
 import re
-import sys
-def Binary_convertor(a,b):
-    a=int(a)
-    if not(-2147483648<=a<=2147483647):
+# operand separators: commas, whitespace and the parens of imm(rs1)
+TOKEN_RE = re.compile(r'[,\s()]+')
+# numeric immediate, as accepted by int()
+INT_RE = re.compile(r'[+-]?\d+')
+def encode_imm(val,bits):
+    val=int(val)
+    if not(-2147483648<=val<=2147483647):
         print("Immediate out of range")
         exit()
-    if a < 0:
-        # Convert negative numbers to binary using two's complement
-        binary_representation = bin((1 << b) + a)[2:]
-    else:
-        binary_representation = bin(a)[2:]
-
-    # Ensure the binary representation has the desired number of bits
-    binary_representation = binary_representation.zfill(b)
-
-    return binary_representation
-    # print(s)
-
-# print(Binary_convertor(-30,32))
+    return val & ((1<<bits)-1)
+REG_NAMES = ['zero','ra','sp','gp','tp','t0','t1','t2','s0','s1','a0','a1','a2','a3','a4','a5',
+             'a6','a7','s2','s3','s4','s5','s6','s7','s8','s9','s10','s11','t3','t4','t5','t6']
+# register name -> register number, built once instead of per operand
+REG_MAP = {name: i for i,name in enumerate(REG_NAMES)}
+REG_MAP['fp'] = REG_MAP['s0']
 def reg_add(register):
-    if(register=='zero'):
-        return(Binary_convertor(0,5))
-    if(register=='ra'):
-        return(Binary_convertor(1,5))
-    if(register=='sp'):
-        return(Binary_convertor(2,5))
-    if(register=='gp'):
-        return(Binary_convertor(3,5))
-    if(register=='tp'):
-        return(Binary_convertor(4,5))
-    if(register=='t0'):
-        return(Binary_convertor(5,5))
-    if(register=='t1'):
-        return(Binary_convertor(6,5))
-    if(register=='t2'):
-        return(Binary_convertor(7,5))
-    if(register=='s0' or register =='fp'):
-        return(Binary_convertor(8,5))
-    if(register=='s1'):
-        return(Binary_convertor(9,5))
-    if(register=='a0'):
-        return(Binary_convertor(10,5))
-    if(register=='a1'):
-        return(Binary_convertor(11,5))
-    if(register=='a2'):
-        return(Binary_convertor(12,5))
-    if(register=='a3'):
-        return(Binary_convertor(13,5))
-    if(register=='a4'):
-        return(Binary_convertor(14,5))
-    if(register=='a5'):
-        return(Binary_convertor(15,5))
-    if(register=='a6'):
-        return(Binary_convertor(16,5))
-    if(register=='a7'):
-        return(Binary_convertor(17,5))
-    if(register=='s2'):
-        return(Binary_convertor(18,5))
-    if(register=='s3'):
-        return(Binary_convertor(19,5))
-    if(register=='s4'):
-        return(Binary_convertor(20,5))
-    if(register=='s5'):
-        return(Binary_convertor(21,5))
-    if(register=='s6'):
-        return(Binary_convertor(22,5))
-    if(register=='s7'):
-        return(Binary_convertor(23,5))
-    if(register=='s8'):
-        return(Binary_convertor(24,5))
-    if(register=='s9'):
-        return(Binary_convertor(25,5))
-    if(register=='s10'):
-        return(Binary_convertor(26,5))
-    if(register=='s11'):
-        return(Binary_convertor(27,5))
-    if(register=='t3'):
-        return(Binary_convertor(28,5))
-    if(register=='t4'):
-        return(Binary_convertor(29,5))
-    if(register=='t5'):
-        return(Binary_convertor(30,5))
-    if(register=='t6'):
-        return(Binary_convertor(31,5))
+    if register in REG_MAP:
+        return REG_MAP[register]
     print("error : invalid register")
-def r_type(data,i):
-    ans = []
-    if(data[0]=='add'):
-        ans.append('0110011')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('000')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        ans.append(reg_add(data[3]))  #rs2
-        ans.append('0000000')  #funct7
-    if(data[0]=='sub'):
-        ans.append('0110011')   #opcode
-        ans.append(reg_add(data[1]))   #rd
-        ans.append('000')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        ans.append(reg_add(data[3]))  #rs2
-        ans.append('0100000')  #funct7
-    if(data[0]=='sll'):
-        ans.append('0110011')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('001')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        ans.append(reg_add(data[3]))  #rs2
-        ans.append('0000000')  #funct7
-    if(data[0]=='slt'):
-        ans.append('0110011')  #opcode
-        ans.append(reg_add(data[1])) #rd
-        ans.append('010')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        ans.append(reg_add(data[3]))  #rs2
-        ans.append('0000000')  #funct7
-    if(data[0]=='sltu'):
-        ans.append('0110011')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('011')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        ans.append(reg_add(data[3]))  #rs2
-        ans.append('0000000')  #funct7
-    if(data[0]=='xor'):
-        ans.append('0110011')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('100')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        ans.append(reg_add(data[3]))  #rs2
-        ans.append('0000000')  #funct7
-    if(data[0]=='srl'):
-        ans.append('0110011')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('101')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        ans.append(reg_add(data[3]))  #rs2
-        ans.append('0000000')  #funct7
-    if(data[0]=='or'):
-        ans.append('0110011')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('110')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        ans.append(reg_add(data[3]))  #rs2
-        ans.append('0000000')  #funct7
-    if(data[0]=='and'):
-        ans.append('0110011')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('111')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        ans.append(reg_add(data[3]))  #rs2
-        ans.append('0000000')  #funct7
-    # while(len(ans)!=0):
-    #     print(ans.pop()," ",end="")
-    # print("\n")
-    return ans
-    #[31:25] [24:20] [19:15] [14:12] [11:7] [6:0]
-    #funct7 rs2 rs1 funct3 rd opcode
-def i_type(data,i):  
-    ans=[]  # no [::-1] && [0:12]
-    if(data[0]=='lw'):
-        ans.append('0000011')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('010')  #funct3
-        ans.append(reg_add(data[3]))  #rs1
-        binr = Binary_convertor(data[2],32)
-        # binr = binr[::-1]
-        ans.append(binr[-12:])  #imm[11:0]
-    if(data[0]=='addi'):
-        ans.append('0010011')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('000')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        binr = Binary_convertor(data[3],32)
-        # binr = binr[::-1]
-        ans.append(binr[-12:])  #imm[11:0]
-    if(data[0]=='sltiu'):
-        ans.append('0010011')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('011')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        binr = Binary_convertor(data[3],32)
-        # binr = binr[::-1]
-        ans.append(binr[-12:])  #imm[11:0]  (0:12)      
-    if(data[0]=='jalr'):
-        ans.append('1100111')  #opcode
-        ans.append(reg_add(data[1]))  #rd
-        ans.append('000')  #funct3
-        ans.append(reg_add(data[2]))  #rs1
-        binr = Binary_convertor(data[3],32)
-        # binr = binr[::-1]  #i type
-        # print(binr)
-        ans.append(binr[-12:])  #imm[11:0] # i type[0:12]
-    # while(len(ans)!=0):
-    #     print(ans.pop(),end=" ")
-    # print("\n")
-    return ans
-    #[31:20] [19:15] [14:12] [11:7] [6:0]
-    #imm[11 : 0] rs1 funct3 rd opcode
-def s_type(data,i):  ############################ERROR#########CORRECTED_IG###################
-    ans=[]
-    if (data[0]=='sw'):
-        ans.append('0100011')  #opcode
-        binr=Binary_convertor(data[2],32) #imm[0:11]
-        # binr=binr[::-1]  #removed
-        # print(binr,"\n")
-        ans.append(binr[-5:])  #imm[4:0]  #doubt_finish
-        ans.append('010')  #funct3
-        ans.append(reg_add(data[3]))  #rs1
-        ans.append(reg_add(data[1]))  #rs2
-        ans.append(binr[-12:-5])  #imm[11:5]
-    # while(len(ans)!=0):
-    #     print(ans.pop(),end=" ")
-    # print("\n")
-    return ans
-    #imm[11 : 5] rs2 rs1 funct3 imm[4 : 0] opcode S-type
-    #[31:25] [24:20] [19:15] [14:12] [11:7] [6:0]
-def b_type(data, i):
-    # Check for virtual halt condition (unchanged)
-    if data[0] == 'beq' and data[1] == 'zero' and data[2] == 'zero' and data[3] == '0':
-        global check
-        check = 1
-    ans = []
-    if data[0] == 'beq':
-        # Instead of .isalpha(), try converting to int:
-        try:
-            immediate_val = int(data[3])
-        except ValueError:
-            immediate_val = (label_dict.get(data[3]) - i) * 4
-            data[3] = immediate_val
-        ans.append('1100011')  # opcode
-        binr = Binary_convertor(data[3], 32)
-        imm1 = binr[-5:-1] + binr[-12]
-        ans.append(imm1)  # imm[4:1|11]
-        ans.append('000')   # funct3
-        ans.append(reg_add(data[1]))  # rs1
-        ans.append(reg_add(data[2]))  # rs2
-        imm2 = binr[-13] + binr[-11:-5]
-        ans.append(imm2)  # imm[12|10:5]
-    if data[0] == 'bne':
-        try:
-            immediate_val = int(data[3])
-        except ValueError:
-            immediate_val = (label_dict.get(data[3]) - i) * 4
-            data[3] = immediate_val
-        ans.append('1100011')
-        binr = Binary_convertor(data[3], 32)
-        imm1 = binr[-5:-1] + binr[-12]
-        ans.append(imm1)
-        ans.append('001')
-        ans.append(reg_add(data[1]))
-        ans.append(reg_add(data[2]))
-        imm2 = binr[-13] + binr[-11:-5]
-        ans.append(imm2)
-    if data[0] == 'blt':
-        try:
-            immediate_val = int(data[3])
-        except ValueError:
-            immediate_val = (label_dict.get(data[3]) - i) * 4
-            data[3] = immediate_val
-        ans.append('1100011')
-        binr = Binary_convertor(data[3], 32)
-        imm1 = binr[-5:-1] + binr[-12]
-        ans.append(imm1)
-        ans.append('100')
-        ans.append(reg_add(data[1]))
-        ans.append(reg_add(data[2]))
-        imm2 = binr[-13] + binr[-11:-5]
-        ans.append(imm2)
-    if data[0] == 'bge':
-        try:
-            immediate_val = int(data[3])
-        except ValueError:
-            immediate_val = (label_dict.get(data[3]) - i) * 4
-            data[3] = immediate_val
-        ans.append('1100011')
-        binr = Binary_convertor(data[3], 32)
-        imm1 = binr[-5:-1] + binr[-12]
-        ans.append(imm1)
-        ans.append('101')
-        ans.append(reg_add(data[1]))
-        ans.append(reg_add(data[2]))
-        imm2 = binr[-13] + binr[-11:-5]
-        ans.append(imm2)
-    if data[0] == 'bltu':
-        try:
-            immediate_val = int(data[3])
-        except ValueError:
-            immediate_val = (label_dict.get(data[3]) - i) * 4
-            data[3] = immediate_val
-        ans.append('1100011')
-        binr = Binary_convertor(data[3], 32)
-        imm1 = binr[-5:-1] + binr[-12]
-        ans.append(imm1)
-        ans.append('110')
-        ans.append(reg_add(data[1]))
-        ans.append(reg_add(data[2]))
-        imm2 = binr[-13] + binr[-11:-5]
-        ans.append(imm2)
-    if data[0] == 'bgeu':
-        try:
-            immediate_val = int(data[3])
-        except ValueError:
-            immediate_val = (label_dict.get(data[3]) - i) * 4
-            data[3] = immediate_val
-        ans.append('1100011')
-        binr = Binary_convertor(data[3], 32)
-        imm1 = binr[-5:-1] + binr[-12]
-        ans.append(imm1)
-        ans.append('111')
-        ans.append(reg_add(data[1]))
-        ans.append(reg_add(data[2]))
-        imm2 = binr[-13] + binr[-11:-5]
-        ans.append(imm2)
-    return ans
-
-
-def u_type(data,i):
-    ans=[]
-    if (data[0]=='lui'):
-        ans.append('0110111') #opcode
-        ans.append(reg_add(data[1]))  #rd
-        binr = Binary_convertor(data[2],32)
-        # binr = binr[::-1]
-        ans.append(binr[-32:-12])  #imm[31:12]
-    if(data[0]=='auipc'):
-        ans.append('0010111') #opcode
-        ans.append(reg_add(data[1]))  #rd
-        binr = Binary_convertor(data[2],32)
-        # binr = binr[::-1]
-        ans.append(binr[-32:-12])  #imm[31:12]
-    # while(len(ans)!=0):
-    #     print(ans.pop(),end=" ")
-    # print("\n")
-    return   ans
-    #[31:12] [11:7] [6:0]
-    #imm[31:12] rd opcode
-    
-def j_type(data, i):
-    ans = []
-    if data[0] == 'jal':
-        try:
-            offset = int(data[2])
-        except ValueError:
-            offset = (label_dict.get(data[2]) - i) * 4
-            data[2] = offset
-        # Use the offset directly (do not shift right by 1)
-        if offset < 0:
-            imm_21 = format((1 << 21) + offset, '021b')
+# mnemonic -> (format, opcode, funct3, funct7)
+# format tags: R, I, L (load, imm(rs1) operand), S, B, U, J
+OPCODES = {
+    'add':('R',0b0110011,0b000,0b0000000),
+    'sub':('R',0b0110011,0b000,0b0100000),
+    'sll':('R',0b0110011,0b001,0b0000000),
+    'slt':('R',0b0110011,0b010,0b0000000),
+    'sltu':('R',0b0110011,0b011,0b0000000),
+    'xor':('R',0b0110011,0b100,0b0000000),
+    'srl':('R',0b0110011,0b101,0b0000000),
+    'or':('R',0b0110011,0b110,0b0000000),
+    'and':('R',0b0110011,0b111,0b0000000),
+    #################
+    'lw':('L',0b0000011,0b010),
+    'addi':('I',0b0010011,0b000),
+    'sltiu':('I',0b0010011,0b011),
+    'jalr':('I',0b1100111,0b000),
+    #################
+    'sw':('S',0b0100011,0b010),
+    ################
+    'beq':('B',0b1100011,0b000),
+    'bne':('B',0b1100011,0b001),
+    'blt':('B',0b1100011,0b100),
+    'bge':('B',0b1100011,0b101),
+    'bltu':('B',0b1100011,0b110),
+    'bgeu':('B',0b1100011,0b111),
+    ##############
+    'lui':('U',0b0110111),
+    'auipc':('U',0b0010111),
+    ##############
+    'jal':('J',0b1101111),
+}
+def enc_b(imm):
+    # place imm[12|10:5] at [31:25] and imm[4:1|11] at [11:7]
+    return ((((imm >> 12) & 1) << 31) | (((imm >> 5) & 0x3f) << 25)
+            | (((imm >> 1) & 0xf) << 8) | (((imm >> 11) & 1) << 7))
+def enc_j(imm):
+    # place imm[20|10:1|11|19:12] at [31:12]
+    return ((((imm >> 20) & 1) << 31) | (((imm >> 1) & 0x3ff) << 21)
+            | (((imm >> 11) & 1) << 20) | (((imm >> 12) & 0xff) << 12))
+def encode(mnemonic,data):
+    fields = OPCODES.get(mnemonic)
+    if fields is None:
+        print("error: ",mnemonic)
+        return None
+    kind = fields[0]
+    opcode = fields[1]
+    if kind == 'R':
+        #funct7 rs2 rs1 funct3 rd opcode
+        return ((fields[3] << 25) | (reg_add(data[3]) << 20) | (reg_add(data[2]) << 15)
+                | (fields[2] << 12) | (reg_add(data[1]) << 7) | opcode)
+    if kind == 'I' or kind == 'L':
+        #imm[11:0] rs1 funct3 rd opcode
+        if kind == 'L':
+            rs1, imm = data[3], data[2]  # lw rd,imm(rs1)
         else:
-            imm_21 = format(offset, '021b')
-        # Rearrange the bits according to the JAL spec:
-        # imm[20] | imm[10:1] | imm[11] | imm[19:12]
-        encoded_imm = imm_21[0] + imm_21[10:20] + imm_21[9] + imm_21[1:9]
-        ans.append('1101111')           # opcode for jal
-        ans.append(reg_add(data[1]))     # rd
-        ans.append(encoded_imm)          # scrambled immediate
-    return ans
-
-
-
-def default_case(data,i):
-    print("error: ",data[0])
-    return
-def Switch_case(case_value,data,i):
-    #print("hello")
-    switch_dict = {
-        'add':r_type,
-        'sub':r_type,
-        'sll':r_type,
-        'slt':r_type,
-        'sltu':r_type,
-        'xor':r_type,
-        'srl':r_type,
-        'or':r_type,
-        'and':r_type,
-        #################
-        'lw':i_type,
-        'addi':i_type,
-        'sltiu':i_type,
-        'jalr':i_type,
-        #################
-        'sw':s_type,
-        ################
-        'beq':b_type,
-        'bne':b_type,
-        'blt':b_type,
-        'bge':b_type,
-        'bltu':b_type,
-        'bgeu':b_type,
-        ##############
-        'lui':u_type,
-        'auipc':u_type,
-        ##############
-        'jal':j_type,
-    }
-    global output_name
-    with open(output_name,'a+') as f:
-        s = ""
-        l = switch_dict.get(case_value,default_case)(data,i)
-        while l:
-            s += l.pop()
-        s += "\n"
-        f.write(s)
-            
-       
-        
-
-final_ans=[]
+            rs1, imm = data[2], data[3]
+        return ((encode_imm(imm,12) << 20) | (reg_add(rs1) << 15) | (fields[2] << 12)
+                | (reg_add(data[1]) << 7) | opcode)
+    if kind == 'S':
+        #imm[11:5] rs2 rs1 funct3 imm[4:0] opcode
+        imm = encode_imm(data[2],12)
+        return (((imm >> 5) << 25) | (reg_add(data[1]) << 20) | (reg_add(data[3]) << 15)
+                | (fields[2] << 12) | ((imm & 0x1f) << 7) | opcode)
+    if kind == 'B':
+        imm = encode_imm(data[3],13)
+        #imm[12|10:5] rs2 rs1 funct3 imm[4:1|11] opcode
+        return (enc_b(imm) | (reg_add(data[2]) << 20) | (reg_add(data[1]) << 15)
+                | (fields[2] << 12) | opcode)
+    if kind == 'U':
+        #imm[31:12] rd opcode
+        return (encode_imm(data[2],32) & 0xfffff000) | (reg_add(data[1]) << 7) | opcode
+    # J
+    # Use the offset directly (do not shift right by 1)
+    imm = encode_imm(data[2],21)
+    return enc_j(imm) | (reg_add(data[1]) << 7) | opcode
+def Switch_case(case_value,data):
+    word = encode(case_value,data)
+    if word is None:
+        out_lines.append("\n")
+    else:
+        out_lines.append(f"{word:032b}\n")
 
 file_name = "read.txt"
 
 output_name = "output.txt"
+out_lines = []
 
-check = 0
+# beq zero,zero,0 ends the program
+VIRTUAL_HALT = ['beq','zero','zero','0']
 label_dict={}
-with open(file_name,"+r") as input_file:
-    i=-1
-    while(True):
-        b=input_file.readline()
-        if not b:
-            break
-        if not b.strip():  #for skipping empty lines
-            continue
-        i=i+1
-        if(':' in b):
-            label, rest_of_line = b.split(':', 1)
-            label=label.strip()
-            # data = re.split(r'[,\s()]+', rest_of_line.strip())
-            label_dict[label]=i
-    input_file.seek(0)
-    i=-1        
-    while(True):
-        a = input_file.readline()
-        if not a:
-            break
-        if not a.strip():  #for skipping empty lines
-            continue
-        i=i+1
-        if(':' in a):
-            label, rest_of_line = a.split(':', 1)
-            label=label.strip()
-            data = re.split(r'[,\s()]+', rest_of_line.strip())
-
-        else:
-            pattern = re.compile(r'[,\s()]+')
-            data = re.split(pattern,a)
-        if(data[0]==''):
-            data=data[1:]
-        print(data)
-        if (data):
-            Switch_case(data[0],data,i)
-    if(check == 0):
-        print("No Virtual Halt")
\ No newline at end of file
+with open(file_name,"r") as input_file:
+    # skip empty lines once here; both passes index into this list
+    lines = [ln.strip() for ln in input_file if ln.strip()]
+program = []
+for i,a in enumerate(lines):
+    if(':' in a):
+        label, a = a.split(':', 1)
+        label_dict[label.strip()]=i
+        a = a.strip()
+    data = TOKEN_RE.split(a)
+    if(data[0]==''):
+        data=data[1:]
+    program.append(data)
+# replace label targets of branches/jumps with their byte offset
+for i,data in enumerate(program):
+    fields = OPCODES.get(data[0]) if data else None
+    if fields is not None and fields[0] in ('B','J'):
+        k = 3 if fields[0] == 'B' else 2
+        target = data[k]
+        if not INT_RE.fullmatch(target):
+            if target not in label_dict:
+                print("error: undefined label",target)
+                exit()
+            data[k] = str((label_dict[target] - i) * 4)
+for data in program:
+    print(data)
+    if (data):
+        Switch_case(data[0],data)
+if not any(data[:4] == VIRTUAL_HALT for data in program):
+    print("No Virtual Halt")
+with open(output_name,'w') as f:
+    f.write(''.join(out_lines))
@@ -1,18 +1,251 @@
 
 import sys
+from array import array
+
+# numpy/numba are only imported when a compiled backend is selected
+np = None
+
+# Trace text for every in-range PC (word index -> byte address in binary)
+PC_BIN = [format(i * 4, '032b') for i in range(32)]
+
+def sext32(x):
+    """Read an unsigned 32-bit value as a signed int."""
+    return (x ^ 0x80000000) - 0x80000000
+
+# Exit status of run(), with the message printed for each error
+HALTED = 0
+ERR_MAX_INSTR = 1
+ERR_PC_RANGE = 2
+ERR_OPCODE = 3
+ERR_R_FUNCT7 = 4
+ERR_SRL_FUNCT7 = 5
+ERR_R_FUNCT3 = 6
+ERR_I_FUNCT3 = 7
+ERR_LOAD_RANGE = 8
+ERR_LOAD_FUNCT3 = 9
+ERR_JALR_RANGE = 10
+ERR_STORE_RANGE = 11
+ERR_STORE_FUNCT3 = 12
+ERR_B_FUNCT3 = 13
+
+RUN_ERRORS = {
+    ERR_MAX_INSTR: "Error: Maximum instruction count exceeded (infinite loop?)",
+    ERR_PC_RANGE: "Error: PC out of range ({pc}) at instruction count {count}",
+    ERR_OPCODE: "Error: Unknown opcode={detail:#x} at PC={pc}",
+    ERR_R_FUNCT7: "Error: Unknown R-type funct7={detail} at PC={pc}",
+    ERR_SRL_FUNCT7: "Error: Unknown SRL funct7={detail} at PC={pc}",
+    ERR_R_FUNCT3: "Error: Unknown R-type funct3={detail} at PC={pc}",
+    ERR_I_FUNCT3: "Error: Unknown I-type funct3={detail} at PC={pc}",
+    ERR_LOAD_RANGE: "Error: Memory access out of range (addr={detail:#x}) at PC={pc}",
+    ERR_LOAD_FUNCT3: "Error: Unsupported load funct3={detail} at PC={pc}",
+    ERR_JALR_RANGE: "Error: JALR target out of range (addr={detail:#x}) at PC={pc}",
+    ERR_STORE_RANGE: "Error: Memory store out of range (addr={detail:#x}) at PC={pc}",
+    ERR_STORE_FUNCT3: "Error: Unsupported store funct3={detail} at PC={pc}",
+    ERR_B_FUNCT3: "Error: Unknown B-type funct3={detail} at PC={pc}",
+}
+
+def run(mem, regs, pc, max_i, trace):
+    """
+    Array-only version of RISCVSimulator.execute_program for numba.
+    mem and regs are int64 arrays holding unsigned 32-bit values and are
+    updated in place. Before each instruction, row n of trace gets
+    PC*4 followed by x0..x31.
+    Returns (status, rows, pc, count, detail).
+    """
+    count = 0
+    rows = 0
+    while count < max_i:
+        if pc < 0 or pc >= 32:
+            return ERR_PC_RANGE, rows, pc, count, 0
+        instruction = mem[pc]
+        trace[rows, 0] = pc * 4
+        for r in range(32):
+            trace[rows, r + 1] = regs[r]
+        rows += 1
+
+        opcode = instruction & 0x7f
+        # x0 is always 0: writes to it land in the discard slot regs[32]
+        rd     = ((instruction >> 7) & 0x1f) or 32
+        funct3 = (instruction >> 12) & 0x7
+        rs1    = (instruction >> 15) & 0x1f
+        rs2    = (instruction >> 20) & 0x1f
+        funct7 = (instruction >> 25) & 0x7f
+
+        imm_i = (instruction >> 20) & 0xfff
+        if imm_i & 0x800:
+            imm_i |= 0xfffff000
+
+        # R-type
+        if opcode == 0x33:
+            if funct3 == 0x0:
+                if funct7 == 0x00:  # ADD
+                    regs[rd] = (regs[rs1] + regs[rs2]) & 0xffffffff
+                elif funct7 == 0x20:  # SUB
+                    regs[rd] = (regs[rs1] - regs[rs2]) & 0xffffffff
+                else:
+                    return ERR_R_FUNCT7, rows, pc, count, funct7
+            elif funct3 == 0x2 and funct7 == 0x00:  # SLT
+                # sext32() inlined, a plain Python helper can't be called from njit code
+                s1 = (regs[rs1] ^ 0x80000000) - 0x80000000
+                s2 = (regs[rs2] ^ 0x80000000) - 0x80000000
+                regs[rd] = 1 if s1 < s2 else 0
+            elif funct3 == 0x5:
+                if funct7 == 0x00:  # SRL
+                    regs[rd] = regs[rs1] >> (regs[rs2] & 0x1f)
+                else:
+                    return ERR_SRL_FUNCT7, rows, pc, count, funct7
+            elif funct3 == 0x6 and funct7 == 0x00:  # OR
+                regs[rd] = regs[rs1] | regs[rs2]
+            elif funct3 == 0x7 and funct7 == 0x00:  # AND
+                regs[rd] = regs[rs1] & regs[rs2]
+            elif funct3 == 0x2 or funct3 == 0x6 or funct3 == 0x7:
+                return ERR_R_FUNCT7, rows, pc, count, funct7
+            else:
+                return ERR_R_FUNCT3, rows, pc, count, funct3
+            pc += 1
+
+        # I-type arithmetic/logic
+        elif opcode == 0x13:
+            if funct3 == 0x0:  # ADDI
+                regs[rd] = (regs[rs1] + imm_i) & 0xffffffff
+            else:
+                return ERR_I_FUNCT3, rows, pc, count, funct3
+            pc += 1
+
+        # LW
+        elif opcode == 0x03:
+            addr = (regs[rs1] + imm_i) & 0xffffffff
+            if funct3 != 0x2:
+                return ERR_LOAD_FUNCT3, rows, pc, count, funct3
+            mem_idx = addr // 4
+            if mem_idx >= 32:
+                return ERR_LOAD_RANGE, rows, pc, count, addr
+            regs[rd] = mem[mem_idx]
+            pc += 1
+
+        # JALR
+        elif opcode == 0x67:
+            target = (regs[rs1] + imm_i) & 0xfffffffe
+            regs[rd] = pc + 1
+            jump_word = target // 4
+            if jump_word >= 32:
+                return ERR_JALR_RANGE, rows, pc, count, target
+            pc = jump_word
+
+        # S-type (SW)
+        elif opcode == 0x23:
+            imm_s = (((instruction >> 25) & 0x7f) << 5) | ((instruction >> 7) & 0x1f)
+            if imm_s & 0x800:
+                imm_s |= 0xfffff000
+            addr = (regs[rs1] + imm_s) & 0xffffffff
+            if funct3 != 0x2:
+                return ERR_STORE_FUNCT3, rows, pc, count, funct3
+            mem_idx = addr // 4
+            if mem_idx >= 32:
+                return ERR_STORE_RANGE, rows, pc, count, addr
+            mem[mem_idx] = regs[rs2]
+            pc += 1
+
+        # B-type
+        elif opcode == 0x63:
+            offset = ((((instruction >> 31) & 0x1) << 12) | (((instruction >> 7) & 0x1) << 11)
+                      | (((instruction >> 25) & 0x3f) << 5) | (((instruction >> 8) & 0xf) << 1))
+            if offset & 0x1000:
+                offset |= 0xffffe000
+            # Virtual halt: beq zero, zero, 0
+            if funct3 == 0x0 and rs1 == 0 and rs2 == 0 and offset == 0:
+                count += 1
+                if count >= max_i:
+                    break
+                return HALTED, rows, pc, count, 0
+            if funct3 == 0x0:  # BEQ
+                taken = regs[rs1] == regs[rs2]
+            elif funct3 == 0x1:  # BNE
+                taken = regs[rs1] != regs[rs2]
+            else:
+                return ERR_B_FUNCT3, rows, pc, count, funct3
+            if taken:
+                pc += offset // 4
+            else:
+                pc += 1
+
+        # JAL
+        elif opcode == 0x6f:
+            offset = ((((instruction >> 31) & 0x1) << 20) | (((instruction >> 12) & 0xff) << 12)
+                      | (((instruction >> 20) & 0x1) << 11) | (((instruction >> 21) & 0x3ff) << 1))
+            if offset & 0x100000:
+                offset |= 0xffe00000
+            regs[rd] = pc + 1
+            pc += offset // 4
+
+        else:
+            return ERR_OPCODE, rows, pc, count, opcode
+
+        count += 1
+    return ERR_MAX_INSTR, rows, pc, count, 0
+
+# run() compiled by numba, built on first use of the numba backend
+run_jit = None
+
+def load_jit():
+    """Import numpy/numba and compile run() on first use."""
+    global np, run_jit
+    if run_jit is None:
+        import numpy
+        from numba import njit
+        np = numpy
+        run_jit = njit(cache=True)(run)
+    return run_jit
+
+# Trace lines buffered by the Python loop between writes (about 70 KB)
+TRACE_FLUSH_LINES = 64
+
+# Trace rows rendered per numpy block (about 4.5 MB of text)
+TRACE_BLOCK_ROWS = 4096
+
+# Interpreter loops execute_program can use; "cython" needs sim_core.pyx
+# built in place with: cythonize -i sim_core.pyx
+BACKENDS = ("python", "numba", "cython")
 
 class RISCVSimulator:
-    def __init__(self):
-        # Single 32-word memory (indices 0..31)
-        self.memory = [0] * 32
-        # Registers x0..x31
-        self.registers = [0]*32
+    def __init__(self, backend="python"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+        # Interpreter loop; the compiled ones are opt-in since their import
+        # and compile time outweighs the gain on short programs
+        self.backend = backend
+        # Single 32-word memory (indices 0..31), packed unsigned 32-bit words
+        self.memory = array('I', [0] * 32)
+        # Registers x0..x31, plus slot 32 that absorbs writes to x0
+        self.registers = array('I', [0] * 33)
         # Program counter (word index into self.memory)
         self.pc = 0
         # Halt flag
         self.halted = False
         # Instruction count limit for safety
         self.max_instructions = 100000
+        # Per memory word, filled by install() on first execution: the bound
+        # handler, its pre-extracted operands and the register it writes
+        self.handlers = [None] * 32
+        self.operands = [None] * 32
+        self.dests = [32] * 32
+        # Decoder per 7-bit opcode
+        self.dispatch = [self._decode_illegal] * 128
+        self.dispatch[0x33] = self._decode_r
+        self.dispatch[0x13] = self._decode_i_arith
+        self.dispatch[0x03] = self._decode_lw
+        self.dispatch[0x67] = self._decode_jalr
+        self.dispatch[0x23] = self._decode_sw
+        self.dispatch[0x63] = self._decode_branch
+        self.dispatch[0x6f] = self._decode_jal
+        # R-type operation per (funct3 << 7) | funct7, None for unsupported encodings
+        self.r_ops = [None] * 1024
+        self.r_ops[(0x0 << 7) | 0x00] = lambda a, b: (a + b) & 0xffffffff  # ADD
+        self.r_ops[(0x0 << 7) | 0x20] = lambda a, b: (a - b) & 0xffffffff  # SUB
+        self.r_ops[(0x2 << 7) | 0x00] = lambda a, b: 1 if sext32(a) < sext32(b) else 0  # SLT
+        self.r_ops[(0x5 << 7) | 0x00] = lambda a, b: a >> (b & 0x1f)  # SRL
+        self.r_ops[(0x6 << 7) | 0x00] = lambda a, b: a | b  # OR
+        self.r_ops[(0x7 << 7) | 0x00] = lambda a, b: a & b  # AND
 
     def load_program(self, bin_file):
         try:
@@ -42,26 +275,13 @@ class RISCVSimulator:
             return False
 
     def execute_program(self, trace_file):
+        if self.backend == "cython":
+            return self.execute_program_native(trace_file)
+        if self.backend == "numba":
+            return self.execute_program_jit(trace_file)
         try:
             with open(trace_file, 'w') as out:
-                instr_count = 0
-                while not self.halted and instr_count < self.max_instructions:
-                    if self.pc < 0 or self.pc >= 32:
-                        print(f"Error: PC out of range ({self.pc}) at instruction count {instr_count}")
-                        return False
-
-                    instruction = self.memory[self.pc] & 0xffffffff
-                    # Print trace
-                    self.write_trace_line(out)
-
-                    if not self.execute_instruction(instruction):
-                        # An error was printed inside execute_instruction
-                        return False
-
-                    instr_count += 1
-
-                if instr_count >= self.max_instructions:
-                    print("Error: Maximum instruction count exceeded (infinite loop?)")
+                if not self.run_trace(out):
                     return False
 
                 # After halt, dump memory
@@ -72,196 +292,356 @@ class RISCVSimulator:
             print("Error: Could not write trace file")
             return False
 
-    def execute_instruction(self, instruction):
+    def run_trace(self, out):
+        """
+        Run until halt, writing one trace line per instruction to out.
+        Returns False after printing an error.
+        """
+        # Trace lines are buffered and written TRACE_FLUSH_LINES at a time;
+        # the finally also writes the partial trace of a failed run
+        lines = []
+        try:
+            return self._run_trace(lines, out)
+        finally:
+            out.writelines(lines)
+
+    def _run_trace(self, lines, out):
+        instr_count = 0
+        # Binary text of each register, refreshed only when written
+        self.regs_bin = [format(r, '032b') for r in self.registers[:32]]
+        handlers = self.handlers
+        operands = self.operands
+        dests = self.dests
+        while not self.halted and instr_count < self.max_instructions:
+            pc = self.pc
+            if pc < 0 or pc >= 32:
+                print(f"Error: PC out of range ({pc}) at instruction count {instr_count}")
+                return False
+
+            handler = handlers[pc]
+            if handler is None:
+                handler = self.install(pc)
+            # Print trace
+            self.write_trace_line(lines)
+            if len(lines) >= TRACE_FLUSH_LINES:
+                out.writelines(lines)
+                lines.clear()
+
+            if not handler(*operands[pc]):
+                # An error was printed inside the handler
+                return False
+            # Only the destination register can have changed
+            rd = dests[pc]
+            if rd != 32:
+                self.regs_bin[rd] = format(self.registers[rd], '032b')
+
+            instr_count += 1
+
+        if instr_count >= self.max_instructions:
+            print("Error: Maximum instruction count exceeded (infinite loop?)")
+            return False
+        return True
+
+    def install(self, pc):
+        """
+        Decode the word at pc once and store the handler that executes it,
+        its operands and its destination register (32 when none).
+        """
+        decoded = self.decode(self.memory[pc])
+        handler, args = self.dispatch[decoded[0]](decoded, pc)
+        self.handlers[pc] = handler
+        self.operands[pc] = args
+        self.dests[pc] = 32 if decoded[0] in (0x23, 0x63) else decoded[1]
+        return handler
+
+    def decode(self, instruction):
+        """
+        Split an instruction word into its fields and sign-extended immediates.
+        Returns (opcode, rd, funct3, rs1, rs2, funct7, imm_i, imm_s, imm_b, imm_j).
+        """
         opcode = instruction & 0x7f
-        rd     = (instruction >> 7) & 0x1f
+        # x0 is always 0: writes to it land in the discard slot regs[32]
+        rd     = ((instruction >> 7) & 0x1f) or 32
         funct3 = (instruction >> 12) & 0x7
         rs1    = (instruction >> 15) & 0x1f
         rs2    = (instruction >> 20) & 0x1f
         funct7 = (instruction >> 25) & 0x7f
 
-        def imm_i():
-            imm_12 = (instruction >> 20) & 0xfff
-            if imm_12 & 0x800:
-                imm_12 |= 0xfffff000
-            return imm_12
-
-        def imm_b():
-            imm_12   = (instruction >> 31) & 0x1
-            imm_10_5 = (instruction >> 25) & 0x3f
-            imm_4_1  = (instruction >> 8) & 0xf
-            imm_11   = (instruction >> 7) & 0x1
-            val = (imm_12 << 12) | (imm_11 << 11) | (imm_10_5 << 5) | (imm_4_1 << 1)
-            if val & 0x1000:
-                val |= 0xffffe000
-            return val
-
-        def imm_j():
-            imm_20   = (instruction >> 31) & 0x1
-            imm_19_12= (instruction >> 12) & 0xff
-            imm_11   = (instruction >> 20) & 0x1
-            imm_10_1 = (instruction >> 21) & 0x3ff
-            val = (imm_20 << 20) | (imm_19_12 << 12) | (imm_11 << 11) | (imm_10_1 << 1)
-            if val & 0x100000:
-                val |= 0xffe00000
-            return val
-
-        # R-type
-        if opcode == 0x33:
-            if funct3 == 0x0:
-                if funct7 == 0x00:  # ADD
-                    self.registers[rd] = (self.registers[rs1] + self.registers[rs2]) & 0xffffffff
-                elif funct7 == 0x20:  # SUB
-                    self.registers[rd] = (self.registers[rs1] - self.registers[rs2]) & 0xffffffff
-                else:
-                    print(f"Error: Unknown R-type funct7={funct7} at PC={self.pc}")
-                    return False
-            elif funct3 == 0x2:  # SLT
-                s1 = self.registers[rs1] & 0xffffffff
-                s2 = self.registers[rs2] & 0xffffffff
-                # signed
-                s1 = (s1 ^ 0x80000000) - 0x80000000
-                s2 = (s2 ^ 0x80000000) - 0x80000000
-                self.registers[rd] = 1 if s1 < s2 else 0
-            elif funct3 == 0x5:
-                shamt = self.registers[rs2] & 0x1f
-                if funct7 == 0x00:  # SRL
-                    self.registers[rd] = (self.registers[rs1] & 0xffffffff) >> shamt
-                else:
-                    print(f"Error: Unknown SRL funct7={funct7} at PC={self.pc}")
-                    return False
-            elif funct3 == 0x6:  # OR
-                self.registers[rd] = (self.registers[rs1] | self.registers[rs2]) & 0xffffffff
-            elif funct3 == 0x7:  # AND
-                self.registers[rd] = (self.registers[rs1] & self.registers[rs2]) & 0xffffffff
-            else:
-                print(f"Error: Unknown R-type funct3={funct3} at PC={self.pc}")
-                return False
-            self.pc += 1
-
-        # I-type arithmetic/logic
-        elif opcode == 0x13:
-            imm = imm_i()
-            if funct3 == 0x0:  # ADDI
-                self.registers[rd] = (self.registers[rs1] + imm) & 0xffffffff
-            else:
-                print(f"Error: Unknown I-type funct3={funct3} at PC={self.pc}")
-                return False
-            self.pc += 1
+        imm_i = (instruction >> 20) & 0xfff
+        if imm_i & 0x800:
+            imm_i |= 0xfffff000
+
+        imm_11_5 = (instruction >> 25) & 0x7f
+        imm_4_0  = (instruction >> 7) & 0x1f
+        imm_s = (imm_11_5 << 5) | imm_4_0
+        if imm_s & 0x800:
+            imm_s |= 0xfffff000
+
+        imm_12   = (instruction >> 31) & 0x1
+        imm_10_5 = (instruction >> 25) & 0x3f
+        imm_4_1  = (instruction >> 8) & 0xf
+        imm_11   = (instruction >> 7) & 0x1
+        imm_b = (imm_12 << 12) | (imm_11 << 11) | (imm_10_5 << 5) | (imm_4_1 << 1)
+        if imm_b & 0x1000:
+            imm_b |= 0xffffe000
+
+        imm_20   = (instruction >> 31) & 0x1
+        imm_19_12= (instruction >> 12) & 0xff
+        imm_11   = (instruction >> 20) & 0x1
+        imm_10_1 = (instruction >> 21) & 0x3ff
+        imm_j = (imm_20 << 20) | (imm_19_12 << 12) | (imm_11 << 11) | (imm_10_1 << 1)
+        if imm_j & 0x100000:
+            imm_j |= 0xffe00000
+
+        return (opcode, rd, funct3, rs1, rs2, funct7, imm_i, imm_s, imm_b, imm_j)
+
+    # Decoders: return (handler, operands) for one instruction.
+    # Encodings that can't execute get _fail with the error to print.
+
+    def _decode_illegal(self, d, pc):
+        return self._fail, (f"Error: Unknown opcode={hex(d[0])} at PC={pc}",)
+
+    # R-type
+    def _decode_r(self, d, pc):
+        opcode, rd, funct3, rs1, rs2, funct7 = d[:6]
+        op = self.r_ops[(funct3 << 7) | funct7]
+        if op is None:
+            if funct3 == 0x5:
+                return self._fail, (f"Error: Unknown SRL funct7={funct7} at PC={pc}",)
+            if funct3 in (0x0, 0x2, 0x6, 0x7):
+                return self._fail, (f"Error: Unknown R-type funct7={funct7} at PC={pc}",)
+            return self._fail, (f"Error: Unknown R-type funct3={funct3} at PC={pc}",)
+        return self._exec_r, (op, rd, rs1, rs2)
+
+    # I-type arithmetic/logic
+    def _decode_i_arith(self, d, pc):
+        funct3 = d[2]
+        if funct3 != 0x0:
+            return self._fail, (f"Error: Unknown I-type funct3={funct3} at PC={pc}",)
+        return self._exec_addi, (d[1], d[3], d[6])
+
+    # LW (opcode=0x03)
+    def _decode_lw(self, d, pc):
+        funct3 = d[2]
+        if funct3 != 0x2:
+            return self._fail, (f"Error: Unsupported load funct3={funct3} at PC={pc}",)
+        return self._exec_lw, (d[1], d[3], d[6])
+
+    # JALR (opcode=0x67)
+    def _decode_jalr(self, d, pc):
+        return self._exec_jalr, (d[1], d[3], d[6])
+
+    # S-type (SW) (opcode=0x23)
+    def _decode_sw(self, d, pc):
+        funct3 = d[2]
+        if funct3 != 0x2:
+            return self._fail, (f"Error: Unsupported store funct3={funct3} at PC={pc}",)
+        return self._exec_sw, (d[3], d[4], d[7])
+
+    # B-type (opcode=0x63)
+    def _decode_branch(self, d, pc):
+        funct3, rs1, rs2 = d[2:5]
+        offset = d[8]
+        # Virtual halt: beq zero, zero, 0
+        if funct3 == 0x0 and rs1 == 0 and rs2 == 0 and offset == 0:
+            return self._exec_halt, ()
+        if funct3 == 0x0:
+            return self._exec_beq, (rs1, rs2, offset // 4)
+        if funct3 == 0x1:
+            return self._exec_bne, (rs1, rs2, offset // 4)
+        return self._fail, (f"Error: Unknown B-type funct3={funct3} at PC={pc}",)
+
+    # JAL (opcode=0x6f)
+    def _decode_jal(self, d, pc):
+        return self._exec_jal, (d[1], d[9] // 4)
+
+    # Handlers: execute one instruction, update pc, return False on error
+
+    def _fail(self, message):
+        print(message)
+        return False
+
+    def _exec_r(self, op, rd, rs1, rs2):
+        self.registers[rd] = op(self.registers[rs1], self.registers[rs2])
+        self.pc += 1
+        return True
 
-        # LW (opcode=0x03)
-        elif opcode == 0x03:
-            imm = imm_i()
-            addr = (self.registers[rs1] + imm) & 0xffffffff
-            if funct3 == 0x2:
-                mem_idx = addr // 4
-                if mem_idx < 0 or mem_idx >= 32:
-                    print(f"Error: Memory access out of range (addr={hex(addr)}) at PC={self.pc}")
-                    return False
-                self.registers[rd] = self.memory[mem_idx]
-            else:
-                print(f"Error: Unsupported load funct3={funct3} at PC={self.pc}")
-                return False
-            self.pc += 1
+    def _exec_addi(self, rd, rs1, imm):
+        self.registers[rd] = (self.registers[rs1] + imm) & 0xffffffff
+        self.pc += 1
+        return True
 
-        # JALR (opcode=0x67)
-        elif opcode == 0x67:
-            imm = imm_i()
-            target = (self.registers[rs1] + imm) & 0xfffffffe
-            ra = self.pc + 1
-            self.registers[rd] = ra
-            jump_word = target // 4
-            if jump_word < 0 or jump_word >= 32:
-                print(f"Error: JALR target out of range (addr={hex(target)}) at PC={self.pc}")
-                return False
-            self.pc = jump_word
+    def _exec_lw(self, rd, rs1, imm):
+        addr = (self.registers[rs1] + imm) & 0xffffffff
+        mem_idx = addr // 4
+        if mem_idx >= 32:
+            print(f"Error: Memory access out of range (addr={hex(addr)}) at PC={self.pc}")
+            return False
+        self.registers[rd] = self.memory[mem_idx]
+        self.pc += 1
+        return True
 
-        # S-type (SW) (opcode=0x23)
-        elif opcode == 0x23:
-            imm_11_5 = (instruction >> 25) & 0x7f
-            imm_4_0  = (instruction >> 7) & 0x1f
-            imm = (imm_11_5 << 5) | imm_4_0
-            if imm & 0x800:
-                imm |= 0xfffff000
-            addr = (self.registers[rs1] + imm) & 0xffffffff
-            if funct3 == 0x2:
-                mem_idx = addr // 4
-                if mem_idx < 0 or mem_idx >= 32:
-                    print(f"Error: Memory store out of range (addr={hex(addr)}) at PC={self.pc}")
-                    return False
-                self.memory[mem_idx] = self.registers[rs2] & 0xffffffff
-            else:
-                print(f"Error: Unsupported store funct3={funct3} at PC={self.pc}")
-                return False
-            self.pc += 1
+    def _exec_jalr(self, rd, rs1, imm):
+        target = (self.registers[rs1] + imm) & 0xfffffffe
+        self.registers[rd] = self.pc + 1
+        jump_word = target // 4
+        if jump_word >= 32:
+            print(f"Error: JALR target out of range (addr={hex(target)}) at PC={self.pc}")
+            return False
+        self.pc = jump_word
+        return True
 
-        # B-type (opcode=0x63)
-        elif opcode == 0x63:
-            offset = imm_b()
-            # Virtual halt: beq zero, zero, 0
-            if funct3 == 0x0 and rs1 == 0 and rs2 == 0 and offset == 0:
-                self.halted = True
-                return True
+    def _exec_sw(self, rs1, rs2, imm):
+        addr = (self.registers[rs1] + imm) & 0xffffffff
+        mem_idx = addr // 4
+        if mem_idx >= 32:
+            print(f"Error: Memory store out of range (addr={hex(addr)}) at PC={self.pc}")
+            return False
+        self.memory[mem_idx] = self.registers[rs2]
+        # The stored word may be executed later; drop its stale handler
+        self.handlers[mem_idx] = None
+        self.pc += 1
+        return True
 
-            taken = False
-            reg1 = self.registers[rs1] & 0xffffffff
-            reg2 = self.registers[rs2] & 0xffffffff
-            s1 = (reg1 ^ 0x80000000) - 0x80000000
-            s2 = (reg2 ^ 0x80000000) - 0x80000000
+    def _exec_halt(self):
+        self.halted = True
+        return True
 
-            if funct3 == 0x0:  # BEQ
-                taken = (self.registers[rs1] == self.registers[rs2])
-            elif funct3 == 0x1:  # BNE
-                taken = (self.registers[rs1] != self.registers[rs2])
-            else:
-                print(f"Error: Unknown B-type funct3={funct3} at PC={self.pc}")
-                return False
+    def _exec_beq(self, rs1, rs2, step):
+        if self.registers[rs1] == self.registers[rs2]:
+            self.pc += step
+        else:
+            self.pc += 1
+        return True
 
-            if taken:
-                self.pc += (offset // 4)
-            else:
-                self.pc += 1
+    def _exec_bne(self, rs1, rs2, step):
+        if self.registers[rs1] != self.registers[rs2]:
+            self.pc += step
+        else:
+            self.pc += 1
+        return True
 
-        # JAL (opcode=0x6f)
-        elif opcode == 0x6f:
-            offset = imm_j()
-            ra = self.pc + 1
-            self.registers[rd] = ra
-            self.pc += (offset // 4)
+    def _exec_jal(self, rd, step):
+        self.registers[rd] = self.pc + 1
+        self.pc += step
+        return True
 
+    def execute_program_jit(self, trace_file):
+        """
+        Same as execute_program, but runs the loop through the numba-compiled run().
+        """
+        try:
+            run_jit = load_jit()
+        except ImportError:
+            print("Error: numba backend needs numpy and numba installed")
+            return False
+        mem = np.array(self.memory, dtype=np.int64)
+        regs = np.array(self.registers, dtype=np.int64)
+        trace = np.empty((self.max_instructions, 33), dtype=np.uint32)
+        status, rows, pc, count, detail = run_jit(mem, regs, self.pc, self.max_instructions, trace)
+        self.memory = array('I', mem.tolist())
+        self.registers = array('I', regs.tolist())
+        self.pc = pc
+        self.halted = status == HALTED
+        return self.write_run_result(trace_file, status, pc, count, detail,
+                                     lambda out: self.write_trace_array(out, trace[:rows]))
+
+    def execute_program_native(self, trace_file):
+        """
+        Same as execute_program, but runs the loop in the compiled sim_core.run().
+        """
+        global np
+        try:
+            import sim_core
+        except ImportError:
+            print("Error: cython backend needs sim_core built (cythonize -i sim_core.pyx)")
+            return False
+        if np is None:
+            try:
+                import numpy
+                np = numpy
+            except ImportError:
+                pass
+        # flat trace, row n is trace[n*33:(n+1)*33]
+        trace = array('I', [0]) * (33 * self.max_instructions)
+        status, rows, pc, count, detail = sim_core.run(self.memory, self.registers, self.pc,
+                                                       self.max_instructions, trace)
+        self.pc = pc
+        self.halted = status == HALTED
+        if np is not None:
+            rows_arr = np.frombuffer(trace, dtype=np.uint32, count=rows * 33).reshape(rows, 33)
+            write_trace = lambda out: self.write_trace_array(out, rows_arr)
         else:
-            print(f"Error: Unknown opcode={hex(opcode)} at PC={self.pc}")
+            write_trace = lambda out: self.write_trace_flat(out, trace, rows)
+        return self.write_run_result(trace_file, status, pc, count, detail, write_trace)
+
+    def write_run_result(self, trace_file, status, pc, count, detail, write_trace):
+        """
+        Write the trace of a run() call with write_trace(out), then the
+        memory dump or its error.
+        """
+        try:
+            with open(trace_file, 'w') as out:
+                write_trace(out)
+                if status != HALTED:
+                    print(RUN_ERRORS[status].format(pc=pc, count=count, detail=detail))
+                    return False
+                self.write_memory_dump(out)
+            return True
+        except IOError:
+            print("Error: Could not write trace file")
             return False
 
-        # x0 is always 0
-        self.registers[0] = 0
-        return True
+    def write_trace_array(self, out, trace):
+        """
+        Write an (N, 33) uint32 trace as N text lines of 33 space-separated
+        32-bit binary fields. Rows are rendered TRACE_BLOCK_ROWS at a time
+        into one reused byte buffer, so memory stays flat for long traces.
+        """
+        block = np.full((TRACE_BLOCK_ROWS, 33, 33), ord(' '), dtype=np.uint8)
+        block[:, -1, -1] = ord('\n')
+        digits = block[:, :, :32]
+        # the trace goes to the raw byte stream; flush text written so far first
+        out.flush()
+        raw = out.buffer
+        for start in range(0, trace.shape[0], TRACE_BLOCK_ROWS):
+            rows = trace[start:start + TRACE_BLOCK_ROWS]
+            n = rows.shape[0]
+            # big-endian bytes so unpackbits yields each word MSB first
+            bits = np.unpackbits(rows.astype('>u4').view(np.uint8), axis=1).reshape(n, 33, 32)
+            np.add(bits, ord('0'), out=digits[:n])
+            raw.write(block[:n])
+
+    def write_trace_flat(self, out, trace, rows):
+        """
+        Without numpy: write rows of a flat trace TRACE_FLUSH_LINES at a time.
+        """
+        for start in range(0, rows, TRACE_FLUSH_LINES):
+            out.write("".join([" ".join([format(v, '032b') for v in trace[n * 33:(n + 1) * 33]]) + "\n"
+                               for n in range(start, min(start + TRACE_FLUSH_LINES, rows))]))
 
-    def write_trace_line(self, out):
+    def write_trace_line(self, lines):
         """
-        After each instruction, write:
+        After each instruction, append:
           PC_in_binary x0_in_binary x1_in_binary ... x31_in_binary
         """
-        pc_bin = format(self.pc*4, '032b')
-        regs_bin = [format(r & 0xffffffff, '032b') for r in self.registers]
-        out.write(pc_bin + " " + " ".join(regs_bin) + "\n")
+        lines.append(PC_BIN[self.pc] + " " + " ".join(self.regs_bin) + "\n")
 
     def write_memory_dump(self, out):
         """
         After the virtual halt, print all 32 words of memory in binary (one per line).
         """
-        for word in self.memory:
-            out.write(format(word & 0xffffffff, '032b') + "\n")
+        out.write("".join([format(word, '032b') + "\n" for word in self.memory]))
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python simulator.py <input_binary_file> <trace_output_file>")
+    if len(sys.argv) not in (3, 4) or (len(sys.argv) == 4 and sys.argv[3] not in BACKENDS):
+        print("Usage: python simulator.py <input_binary_file> <trace_output_file> [" + "|".join(BACKENDS) + "]")
         return
 
     input_bin = sys.argv[1]
     output_trace = sys.argv[2]
 
-    sim = RISCVSimulator()
+    sim = RISCVSimulator(sys.argv[3] if len(sys.argv) == 4 else "python")
     if not sim.load_program(input_bin):
         return
 
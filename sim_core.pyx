@@ -0,0 +1,161 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+C version of the simulator loop (Simulator.run), built with:
+    cythonize -i sim_core.pyx
+Selected with RISCVSimulator(backend="cython") or the "cython" command line argument.
+"""
+
+# Exit status, must match the values in Simulator.py (checked by test_simulator.py)
+cdef enum:
+    HALTED = 0
+    ERR_MAX_INSTR = 1
+    ERR_PC_RANGE = 2
+    ERR_OPCODE = 3
+    ERR_R_FUNCT7 = 4
+    ERR_SRL_FUNCT7 = 5
+    ERR_R_FUNCT3 = 6
+    ERR_I_FUNCT3 = 7
+    ERR_LOAD_RANGE = 8
+    ERR_LOAD_FUNCT3 = 9
+    ERR_JALR_RANGE = 10
+    ERR_STORE_RANGE = 11
+    ERR_STORE_FUNCT3 = 12
+    ERR_B_FUNCT3 = 13
+
+def run(unsigned int[:] mem, unsigned int[:] regs, long long pc, long long max_i,
+        unsigned int[:] trace):
+    """
+    Same contract as Simulator.run, except trace is flat: row n of the
+    trace is trace[n*33:(n+1)*33]. mem (32 words) and regs (33 slots,
+    slot 32 absorbs writes to x0) are updated in place.
+    Returns (status, rows, pc, count, detail).
+    """
+    cdef long long count = 0, rows = 0
+    cdef long long offset, imm, addr, target
+    cdef unsigned int instruction
+    cdef int opcode, rd, funct3, rs1, rs2, funct7, r
+    cdef bint taken
+    while count < max_i:
+        if pc < 0 or pc >= 32:
+            return ERR_PC_RANGE, rows, pc, count, 0
+        instruction = mem[pc]
+        trace[rows * 33] = <unsigned int>(pc * 4)
+        for r in range(32):
+            trace[rows * 33 + r + 1] = regs[r]
+        rows += 1
+
+        opcode = instruction & 0x7f
+        rd     = (instruction >> 7) & 0x1f
+        if rd == 0:
+            rd = 32
+        funct3 = (instruction >> 12) & 0x7
+        rs1    = (instruction >> 15) & 0x1f
+        rs2    = (instruction >> 20) & 0x1f
+        funct7 = (instruction >> 25) & 0x7f
+
+        imm = (instruction >> 20) & 0xfff
+        if imm & 0x800:
+            imm |= 0xfffff000
+
+        # R-type
+        if opcode == 0x33:
+            if funct3 == 0x0:
+                if funct7 == 0x00:  # ADD
+                    regs[rd] = regs[rs1] + regs[rs2]
+                elif funct7 == 0x20:  # SUB
+                    regs[rd] = regs[rs1] - regs[rs2]
+                else:
+                    return ERR_R_FUNCT7, rows, pc, count, funct7
+            elif funct3 == 0x2 and funct7 == 0x00:  # SLT
+                regs[rd] = 1 if <int>regs[rs1] < <int>regs[rs2] else 0
+            elif funct3 == 0x5:
+                if funct7 == 0x00:  # SRL
+                    regs[rd] = regs[rs1] >> (regs[rs2] & 0x1f)
+                else:
+                    return ERR_SRL_FUNCT7, rows, pc, count, funct7
+            elif funct3 == 0x6 and funct7 == 0x00:  # OR
+                regs[rd] = regs[rs1] | regs[rs2]
+            elif funct3 == 0x7 and funct7 == 0x00:  # AND
+                regs[rd] = regs[rs1] & regs[rs2]
+            elif funct3 == 0x2 or funct3 == 0x6 or funct3 == 0x7:
+                return ERR_R_FUNCT7, rows, pc, count, funct7
+            else:
+                return ERR_R_FUNCT3, rows, pc, count, funct3
+            pc += 1
+
+        # I-type arithmetic/logic
+        elif opcode == 0x13:
+            if funct3 == 0x0:  # ADDI
+                regs[rd] = <unsigned int>((regs[rs1] + imm) & 0xffffffff)
+            else:
+                return ERR_I_FUNCT3, rows, pc, count, funct3
+            pc += 1
+
+        # LW
+        elif opcode == 0x03:
+            addr = (regs[rs1] + imm) & 0xffffffff
+            if funct3 != 0x2:
+                return ERR_LOAD_FUNCT3, rows, pc, count, funct3
+            if addr // 4 >= 32:
+                return ERR_LOAD_RANGE, rows, pc, count, addr
+            regs[rd] = mem[addr // 4]
+            pc += 1
+
+        # JALR
+        elif opcode == 0x67:
+            target = (regs[rs1] + imm) & 0xfffffffe
+            regs[rd] = <unsigned int>(pc + 1)
+            if target // 4 >= 32:
+                return ERR_JALR_RANGE, rows, pc, count, target
+            pc = target // 4
+
+        # S-type (SW)
+        elif opcode == 0x23:
+            imm = (((instruction >> 25) & 0x7f) << 5) | ((instruction >> 7) & 0x1f)
+            if imm & 0x800:
+                imm |= 0xfffff000
+            addr = (regs[rs1] + imm) & 0xffffffff
+            if funct3 != 0x2:
+                return ERR_STORE_FUNCT3, rows, pc, count, funct3
+            if addr // 4 >= 32:
+                return ERR_STORE_RANGE, rows, pc, count, addr
+            mem[addr // 4] = regs[rs2]
+            pc += 1
+
+        # B-type
+        elif opcode == 0x63:
+            offset = ((((instruction >> 31) & 0x1) << 12) | (((instruction >> 7) & 0x1) << 11)
+                      | (((instruction >> 25) & 0x3f) << 5) | (((instruction >> 8) & 0xf) << 1))
+            if offset & 0x1000:
+                offset |= 0xffffe000
+            # Virtual halt: beq zero, zero, 0
+            if funct3 == 0x0 and rs1 == 0 and rs2 == 0 and offset == 0:
+                count += 1
+                if count >= max_i:
+                    break
+                return HALTED, rows, pc, count, 0
+            if funct3 == 0x0:  # BEQ
+                taken = regs[rs1] == regs[rs2]
+            elif funct3 == 0x1:  # BNE
+                taken = regs[rs1] != regs[rs2]
+            else:
+                return ERR_B_FUNCT3, rows, pc, count, funct3
+            if taken:
+                pc += offset // 4
+            else:
+                pc += 1
+
+        # JAL
+        elif opcode == 0x6f:
+            offset = ((((instruction >> 31) & 0x1) << 20) | (((instruction >> 12) & 0xff) << 12)
+                      | (((instruction >> 20) & 0x1) << 11) | (((instruction >> 21) & 0x3ff) << 1))
+            if offset & 0x100000:
+                offset |= 0xffe00000
+            regs[rd] = <unsigned int>(pc + 1)
+            pc += offset // 4
+
+        else:
+            return ERR_OPCODE, rows, pc, count, opcode
+
+        count += 1
+    return ERR_MAX_INSTR, rows, pc, count, 0
@@ -0,0 +1,180 @@
+"""
+Differential test: every available backend must produce the same trace
+file and the same printed result as the pure Python interpreter.
+"""
+import contextlib
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+
+import Simulator
+
+# Each program is one instruction word per line, followed by its assembly
+PROGRAMS = {
+    "halt": """
+        00000110010000000000000100010011  addi sp,zero,100
+        00000000010100000000001010010011  addi t0,zero,5
+        11111111110100000000001100010011  addi t1,zero,-3
+        00000000010101100000011000110011  add a2,a2,t0
+        01000000011001100000011010110011  sub a3,a2,t1
+        00000000010100110010011110110011  slt a5,t1,t0
+        00000000010101100101100100110011  srl s2,a2,t0
+        00000000011001100110100110110011  or s3,a2,t1
+        00000000011001100111101000110011  and s4,a2,t1
+        00000000110000010010001000100011  sw a2,4(sp)
+        00000000110100010010010000100011  sw a3,8(sp)
+        00000000010000010010101010000011  lw s5,4(sp)
+        11111111111100101000001010010011  addi t0,t0,-1
+        00000000000000101001010001100011  bne t0,zero,8
+        00000000000100000000101110010011  addi s7,zero,1
+        00000000011000101000010001100011  beq t0,t1,8
+        00000000010000000000000011101111  jal ra,4
+        00000000000000000000000001100011  beq zero,zero,0
+    """,
+    # runs until max_instructions; jalr zero,ra,0 also writes x0
+    "loop": """
+        00000110010000000000000100010011  addi sp,zero,100
+        00000000010100000000001010010011  addi t0,zero,5
+        11111111110100000000001100010011  addi t1,zero,-3
+        00000000010101100000011000110011  add a2,a2,t0
+        01000000011001100000011010110011  sub a3,a2,t1
+        00000000010100110010011110110011  slt a5,t1,t0
+        00000000010101100101100100110011  srl s2,a2,t0
+        00000000011001100110100110110011  or s3,a2,t1
+        00000000011001100111101000110011  and s4,a2,t1
+        00000000110000010010001000100011  sw a2,4(sp)
+        00000000110100010010010000100011  sw a3,8(sp)
+        00000000010000010010101010000011  lw s5,4(sp)
+        11111111111100101000001010010011  addi t0,t0,-1
+        00000000000000101001010001100011  bne t0,zero,8
+        00000000000100000000101110010011  addi s7,zero,1
+        00000000011000101000011001100011  beq t0,t1,12
+        00000000110000000000000011101111  jal ra,12
+        00000000000000000000000001100011  beq zero,zero,0
+        00000000001000000000110000010011  addi s8,zero,2
+        00000000011100000000101100010011  addi s6,zero,7
+        00000000000000001000000001100111  jalr zero,ra,0
+    """,
+    # builds "addi t0,t0,100" in t3, stores it over word 19 and re-runs it
+    "self_modifying": """
+        01100100001000000000111000010011  addi t3,zero,1602
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000000100011100000111000010011  addi t3,t3,8
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00000001110011100000111000110011  add t3,t3,t3
+        00101001001111100000111000010011  addi t3,t3,659
+        00000000000100101000001010010011  addi t0,t0,1
+        00000000000001001001100001100011  bne s1,zero,16
+        00000000000100000000010010010011  addi s1,zero,1
+        00000101110000000010011000100011  sw t3,76(zero)
+        00000100110000000000000011100111  jalr ra,zero,76
+        00000000000000000000000001100011  beq zero,zero,0
+    """,
+    "signed": """
+        11111111100100000000001010010011  addi t0,zero,-7
+        00000000001100000000001100010011  addi t1,zero,3
+        00000000011000101010001110110011  slt t2,t0,t1
+        00000000010100110010111000110011  slt t3,t1,t0
+        00000000011000101101111010110011  srl t4,t0,t1
+        00000000000000000000000001100011  beq zero,zero,0
+    """,
+    # one program per reachable run() error status
+    "r_funct3": """
+        00000000000100000000001010010011  addi t0,zero,1
+        00000000010100101100001100110011  xor t1,t0,t0
+    """,
+    "load_range": """
+        00001100100000000000001010010011  addi t0,zero,200
+        00000000000000101010001100000011  lw t1,0(t0)
+    """,
+    "i_funct3": """
+        00000000000100000000001010010011  addi t0,zero,1
+        00000000001100101011001100010011  sltiu t1,t0,3
+    """,
+    "jalr_range": """
+        00011001000000000000000011100111  jalr ra,zero,400
+    """,
+    "b_funct3": """
+        00000000000100000000001010010011  addi t0,zero,1
+        00000000010100101101010001100011  bge t0,t0,8
+    """,
+    "store_range": """
+        00000000000100000000001010010011  addi t0,zero,1
+        00011000010100000010100000100011  sw t0,400(zero)
+    """,
+    "opcode": """
+        00000000000000000001001010110111  lui t0,4096
+    """,
+    "pc_range": """
+        00000000000100000000001010010011  addi t0,zero,1
+        11111110000000101001111011100011  bne t0,zero,-4
+    """,
+}
+
+def available_backends():
+    backends = ["python"]
+    if importlib.util.find_spec("numba") is not None:
+        backends.append("numba")
+    if importlib.util.find_spec("sim_core") is not None:
+        backends.append("cython")
+    return backends
+
+def simulate(backend, program, tmp):
+    """Run program on backend; return (printed output, trace file text)."""
+    bin_file = os.path.join(tmp, "prog.txt")
+    trace_file = os.path.join(tmp, f"trace_{backend}.txt")
+    with open(bin_file, "w") as f:
+        for line in program.strip().splitlines():
+            f.write(line.split()[0] + "\n")
+    sim = Simulator.RISCVSimulator(backend)
+    sim.max_instructions = 500
+    printed = io.StringIO()
+    with contextlib.redirect_stdout(printed):
+        assert sim.load_program(bin_file)
+        sim.execute_program(trace_file)
+    with open(trace_file) as f:
+        return printed.getvalue(), f.read()
+
+class BackendDifferentialTest(unittest.TestCase):
+    def test_backends_match_python(self):
+        backends = available_backends()
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, program in PROGRAMS.items():
+                expected = simulate("python", program, tmp)
+                self.assertTrue(expected[1], name)
+                for backend in backends[1:]:
+                    with self.subTest(program=name, backend=backend):
+                        self.assertEqual(simulate(backend, program, tmp), expected)
+
+    def test_error_messages(self):
+        # The error programs fail where intended, so the differential test compares real errors
+        with tempfile.TemporaryDirectory() as tmp:
+            printed = {name: simulate("python", program, tmp)[0] for name, program in PROGRAMS.items()}
+        self.assertIn("Maximum instruction count exceeded", printed["loop"])
+        self.assertEqual(printed["halt"], "")
+        self.assertIn("Unknown R-type funct3=4", printed["r_funct3"])
+        self.assertIn("Memory access out of range (addr=0xc8)", printed["load_range"])
+        self.assertIn("Unknown I-type funct3=3", printed["i_funct3"])
+        self.assertIn("JALR target out of range (addr=0x190)", printed["jalr_range"])
+        self.assertIn("Unknown B-type funct3=5", printed["b_funct3"])
+        self.assertIn("Memory store out of range (addr=0x190)", printed["store_range"])
+        self.assertIn("Unknown opcode=0x37", printed["opcode"])
+        self.assertIn("PC out of range", printed["pc_range"])
+
+if __name__ == "__main__":
+    unittest.main()